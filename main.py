@@ -12,22 +12,23 @@ from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.scrollview import ScrollView
 from kivy.uix.codeinput import CodeInput
-from kivy.graphics import Color, Rectangle, Line, Ellipse
+from kivy.graphics import Color, Rectangle, Line, Mesh, InstructionGroup, PushMatrix, PopMatrix, Translate
 from kivy.core.text import LabelBase
 from kivy.clock import Clock
-from kivy.properties import ListProperty, NumericProperty, ObjectProperty, BooleanProperty, StringProperty
-from kivy.metrics import dp, sp
+from kivy.properties import ListProperty, NumericProperty, BooleanProperty, StringProperty
+from kivy.metrics import dp
 from kivy.lang import Builder
 from kivy.uix.popup import Popup
 from kivy.logger import Logger
 
 import os
-import platform
 import tempfile
-import subprocess
-import traceback
+import shutil
 import time
 import sys
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 
 # Add current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -76,20 +77,23 @@ try:
 except Exception as e:
     debug_log(f"Desktop environment (Android imports failed): {e}")
 
-# Import music21 with better error handling
+# music21 is imported on first use (see load_music21) to keep it off the
+# startup path
 MUSIC21_AVAILABLE = False
-try:
-    from music21 import stream, note, tempo, chord, dynamics, articulations
-    MUSIC21_AVAILABLE = True
-    debug_log("music21 imported successfully!")
-except ImportError as e:
-    debug_log(f"music21 import failed: {e}", "WARN")
-    # Create dummy modules to prevent crashes
-    class DummyModule:
-        def __getattr__(self, name):
-            return lambda *args, **kwargs: None
-    
-    stream = note = tempo = chord = dynamics = articulations = DummyModule()
+stream = note = tempo = chord = dynamics = articulations = None
+
+def load_music21():
+    """Import music21 on first use; returns True when it is available"""
+    global MUSIC21_AVAILABLE, stream, note, tempo, chord, dynamics, articulations
+    if MUSIC21_AVAILABLE:
+        return True
+    try:
+        from music21 import stream, note, tempo, chord, dynamics, articulations
+        MUSIC21_AVAILABLE = True
+        debug_log("music21 imported successfully!")
+    except ImportError as e:
+        debug_log(f"music21 import failed: {e}", "WARN")
+    return MUSIC21_AVAILABLE
 
 # Font registration with better error handling
 def register_fonts():
@@ -102,8 +106,6 @@ def register_fonts():
         debug_log(f"Font registration failed: {e}", "ERROR")
         return False
 
-register_fonts()
-
 # Android MediaPlayer Listeners with better error handling
 if ANDROID:
     try:
@@ -253,6 +255,31 @@ class MainLayout(BoxLayout):
 class NoteDetailsPopup(Popup):
     note_details = StringProperty("")
 
+# Extra distance drawn beyond the visible part of the piano roll, so short
+# scrolls stay within what is already drawn and need no rebuild
+CULL_MARGIN = dp(200)
+
+NOTE_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+# Name of every MIDI note number, e.g. MIDI_NOTE_NAMES[60] == 'C4'
+MIDI_NOTE_NAMES = tuple(f"{NOTE_NAMES[m % 12]}{m // 12 - 1}" for m in range(128))
+
+NOTE_COLOR = (0.8, 0.5, 0.5, 0.8)  # Default color
+SPECIAL_NOTE_COLOR = (1.0, 0.9, 0.2, 0.8)  # Yellow for special notes (velocity > 100)
+
+# Mesh indices are 16-bit, so one Mesh holds at most this many quads
+MAX_QUADS_PER_MESH = 65536 // 4
+
+def add_rect_meshes(group, rects):
+    """Add (x, y, w, h) rectangles to an InstructionGroup as batched triangle Meshes"""
+    for start in range(0, len(rects), MAX_QUADS_PER_MESH):
+        vertices = []
+        indices = []
+        for i, (x, y, w, h) in enumerate(rects[start:start + MAX_QUADS_PER_MESH]):
+            vertices.extend((x, y, 0, 0, x + w, y, 0, 0, x + w, y + h, 0, 0, x, y + h, 0, 0))
+            k = 4 * i
+            indices.extend((k, k + 1, k + 2, k, k + 2, k + 3))
+        group.add(Mesh(vertices=vertices, indices=indices, mode='triangles'))
+
 class PianoRollWidget(BoxLayout):
     notes = ListProperty([])
     beat_scale = NumericProperty(dp(50))
@@ -270,51 +297,71 @@ class PianoRollWidget(BoxLayout):
         try:
             self.size_hint_y = None
             self.height = len(self.pitch_range) * dp(18)
+            # The background only depends on geometry, so it sits in
+            # canvas.before and is resized in place
+            with self.canvas.before:
+                Color(0.2, 0.2, 0.2, 1)
+                self._background = Rectangle(pos=self.pos, size=self.size)
+            # Dynamic layers are rebuilt independently of each other and drawn
+            # in local coordinates under a Translate, so a pos change only
+            # moves them instead of rebuilding them
+            self._layers = {name: InstructionGroup() for name in ('notes', 'playhead')}
+            with self.canvas.after:
+                PushMatrix()
+                self._translate = Translate(self.x, self.y)
+            for layer in self._layers.values():
+                self.canvas.after.add(layer)
+            self.canvas.after.add(PopMatrix())
             self.bind(
-                size=self._update_canvas,
-                pos=self._update_canvas,
-                notes=self._update_canvas,
+                size=self._on_size,
+                pos=self._update_translate,
+                notes=self._on_notes,
+                visible_pitches=self._on_visible_pitches,
+                beat_scale=self._on_beat_scale,
                 current_time=self._update_playhead
             )
-            self.playhead_line = None
-            self._key_colors = {}
-            self._init_key_colors()
+            # All notes redraws go through this trigger, so bursts of property
+            # changes (update_from_stream, scrolling) cost one redraw per frame
+            self._trigger_redraw = Clock.create_trigger(self._update_canvas)
+            # The playhead is one persistent Line whose points are moved in
+            # place; it has no points until current_time first changes
+            self.playhead_line = Line(points=[], width=dp(2))
+            self._layers['playhead'].add(Color(1, 0, 0, 0.9))
+            self._layers['playhead'].add(self.playhead_line)
+            # Per-field columns of self.notes, see _index_notes
+            self._offsets = []
+            self._pitches = []
+            self._durations = []
+            self._velocities = []
+            self._note_indices = []  # position of each column entry in self.notes
+            self._max_beat = 10.0
+            self._max_duration = 0
+            self._pitch_rows = {}  # pitch -> row index in visible_pitches
+            self._notes_dirty = True  # notes layer inputs changed since last draw
+            self._drawn_rect = None  # area covered by the last notes rebuild
             self.selected_note = None
             self.note_popup = None
             debug_log("PianoRollWidget initialized")
         except Exception as e:
             debug_log(f"PianoRollWidget init error: {e}", "ERROR")
 
-    def _init_key_colors(self):
-        """Initialize colors for piano keys (black/white)"""
-        try:
-            black_keys = {1, 3, 6, 8, 10}  # Semitone offsets for black keys
-            for pitch in self.pitch_range:
-                if (pitch % 12) in black_keys:
-                    self._key_colors[pitch] = (0.15, 0.15, 0.15, 1)  # Black keys
-                else:
-                    self._key_colors[pitch] = (0.95, 0.95, 0.95, 1)  # White keys
-        except Exception as e:
-            Logger.error(f"SriDAW: Key color init error: {e}")
-
     def on_touch_down(self, touch):
         try:
             if self.collide_point(*touch.pos) and not self.is_playing and self.notes:
                 # Find which note was clicked
-                for i, note_data in enumerate(self.notes):
-                    if len(note_data) >= 4:
-                        offset, pitch, duration, velocity = note_data[:4]
-                        if pitch in self.visible_pitches:
-                            pitch_index = self.visible_pitches.index(pitch)
-                            x = self.x + offset * self.beat_scale
-                            y = self.y + pitch_index * dp(18)
-                            w = duration * self.beat_scale
-                            h = dp(17)
-
-                            if (x <= touch.x <= x + w) and (y <= touch.y <= y + h):
-                                self.selected_note = i
-                                self.show_note_details(offset, pitch, duration, velocity)
-                                return True
+                columns = zip(self._offsets, self._pitches, self._durations, self._velocities)
+                for i, (offset, pitch, duration, velocity) in enumerate(columns):
+                    if pitch in self._pitch_rows:
+                        pitch_index = self._pitch_rows[pitch]
+                        x = self.x + offset * self.beat_scale
+                        y = self.y + pitch_index * dp(18)
+                        w = duration * self.beat_scale
+                        h = dp(17)
+
+                        if (x <= touch.x <= x + w) and (y <= touch.y <= y + h):
+                            self.selected_note = self._note_indices[i]
+                            self.show_note_details(offset, pitch, duration, velocity)
+                            return True
         except Exception as e:
             debug_log(f"Touch error: {e}", "ERROR")
 
@@ -341,62 +388,144 @@ class PianoRollWidget(BoxLayout):
     def midi_to_note_name(self, midi_note):
         """Convert MIDI note number to note name"""
         try:
-            note_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-            octave = midi_note // 12 - 1
-            note_index = midi_note % 12
-            return f"{note_names[note_index]}{octave}"
+            if 0 <= midi_note < 128:
+                return MIDI_NOTE_NAMES[midi_note]
+            return f"{NOTE_NAMES[midi_note % 12]}{midi_note // 12 - 1}"
         except:
             return f"Note{midi_note}"
 
+    def on_parent(self, widget, parent):
+        if isinstance(parent, ScrollView):
+            parent.bind(
+                scroll_x=self._trigger_redraw,
+                scroll_y=self._trigger_redraw,
+                size=self._trigger_redraw
+            )
+
+    def _visible_rect(self, margin=0):
+        """Return (x0, y0, x1, y1) visible in the parent ScrollView, in local coordinates"""
+        view = self.parent
+        if isinstance(view, ScrollView):
+            x0 = view.scroll_x * max(0, self.width - view.width)
+            y0 = view.scroll_y * max(0, self.height - view.height)
+            x1 = x0 + view.width
+            y1 = y0 + view.height
+        else:
+            x0, y0, x1, y1 = 0, 0, self.width, self.height
+        return x0 - margin, y0 - margin, x1 + margin, y1 + margin
+
+    def _mark_notes_dirty(self):
+        self._notes_dirty = True
+        self._trigger_redraw()
+
+    def _update_translate(self, *args):
+        self._translate.xy = self.pos
+        self._background.pos = self.pos
+
+    def _on_size(self, *args):
+        self._background.size = self.size
+        # The visible rect depends on the size
+        self._trigger_redraw()
+        if self.playhead_line.points:
+            self._update_playhead()
+
+    def _on_beat_scale(self, *args):
+        self._mark_notes_dirty()
+        if self.playhead_line.points:
+            self._update_playhead()
+
+    def _index_notes(self):
+        """Split notes into offset/pitch/duration/velocity columns sorted by offset"""
+        rows = [(i,) + tuple(note_data[:4]) for i, note_data in enumerate(self.notes) if len(note_data) >= 4]
+        # Sorted by start so the visible window can be found by bisection
+        rows.sort(key=itemgetter(1))
+        if rows:
+            indices, offsets, pitches, durations, velocities = zip(*rows)
+        else:
+            indices = offsets = pitches = durations = velocities = ()
+        self._note_indices = list(indices)
+        self._offsets = list(offsets)
+        self._pitches = list(pitches)
+        self._durations = list(durations)
+        self._velocities = list(velocities)
+        self._max_beat = max(
+            (offset + duration for offset, duration in zip(offsets, durations) if duration > 0),
+            default=10.0
+        )
+        self._max_duration = max(durations, default=0)
+
+    def _on_visible_pitches(self, *args):
+        self._pitch_rows = {pitch: row for row, pitch in enumerate(self.visible_pitches)}
+        self._mark_notes_dirty()
+
+    def _on_notes(self, *args):
+        try:
+            self._index_notes()
+        except Exception as e:
+            debug_log(f"Note indexing error: {e}", "ERROR")
+        self._mark_notes_dirty()
+
     def _update_canvas(self, *args):
         try:
-            self.canvas.after.clear()
+            # Scroll and size changes only need a rebuild once the view leaves
+            # the area (visible rect plus margin) drawn last time
+            vx0, vy0, vx1, vy1 = self._visible_rect()
+            drawn = self._drawn_rect
+            if (not self._notes_dirty and drawn is not None
+                    and drawn[0] <= vx0 and drawn[1] <= vy0
+                    and vx1 <= drawn[2] and vy1 <= drawn[3]):
+                return
+            self._notes_dirty = False
+
+            group = self._layers['notes']
+            group.clear()
 
             # Calculate minimum width based on notes
             if self.notes:
-                try:
-                    max_beat = max((note_data[0] + note_data[2]) for note_data in self.notes if len(note_data) >= 3 and note_data[2] > 0)
-                except (ValueError, IndexError):
-                    max_beat = 10.0
-                self.minimum_width = max(dp(800), max_beat * self.beat_scale + dp(100))
+                self.minimum_width = max(dp(800), self._max_beat * self.beat_scale + dp(100))
             else:
                 self.minimum_width = dp(800)
 
-            with self.canvas.after:
-                # Draw simple background
-                Color(0.2, 0.2, 0.2, 1)
-                Rectangle(pos=self.pos, size=self.size)
-
-                # Draw notes
-                for i, note_data in enumerate(self.notes):
-                    if len(note_data) >= 4:
-                        offset, pitch, duration, velocity = note_data[:4]
-                        if pitch in self.visible_pitches:
-                            pitch_index = self.visible_pitches.index(pitch)
-                            x = self.x + offset * self.beat_scale
-                            y = self.y + pitch_index * dp(18)
-                            w = max(dp(5), duration * self.beat_scale)
-                            h = dp(17)
-                            
-                            # Color based on velocity
-                            if velocity > 100:
-                                Color(1.0, 0.9, 0.2, 0.8)  # Yellow for special notes
-                            else:
-                                Color(0.8, 0.5, 0.5, 0.8)  # Default color
-                            
-                            Rectangle(pos=(x, y), size=(w, h))
+            # Draw notes, skipping those scrolled out of view
+            x0, y0, x1, y1 = self._drawn_rect = self._visible_rect(CULL_MARGIN)
+            default_rects = []
+            special_rects = []
+            # Only notes starting in [x0 - longest note, x1] can intersect the span
+            scale = self.beat_scale
+            lo = bisect_left(self._offsets, (x0 - max(dp(5), self._max_duration * scale)) / scale)
+            hi = bisect_right(self._offsets, x1 / scale)
+            columns = zip(self._offsets[lo:hi], self._pitches[lo:hi], self._durations[lo:hi], self._velocities[lo:hi])
+            for offset, pitch, duration, velocity in columns:
+                if pitch in self._pitch_rows:
+                    x = offset * self.beat_scale
+                    w = max(dp(5), duration * self.beat_scale)
+                    if x > x1 or x + w < x0:
+                        continue
+                    pitch_index = self._pitch_rows[pitch]
+                    y = pitch_index * dp(18)
+                    h = dp(17)
+                    if y > y1 or y + h < y0:
+                        continue
+
+                    # Color based on velocity
+                    if velocity > 100:
+                        special_rects.append((x, y, w, h))
+                    else:
+                        default_rects.append((x, y, w, h))
+
+            # One Color and one Mesh per group instead of per note
+            for color, rects in ((NOTE_COLOR, default_rects), (SPECIAL_NOTE_COLOR, special_rects)):
+                if rects:
+                    group.add(Color(*color))
+                    add_rect_meshes(group, rects)
 
         except Exception as e:
             debug_log(f"Canvas update error: {e}", "ERROR")
 
     def _update_playhead(self, *args):
         try:
-            if self.playhead_line:
-                self.canvas.after.remove(self.playhead_line)
-            x_pos = self.x + self.current_time * self.beat_scale
-            with self.canvas.after:
-                Color(1, 0, 0, 0.9)
-                self.playhead_line = Line(points=[x_pos, self.y, x_pos, self.top], width=dp(2))
+            x_pos = self.current_time * self.beat_scale
+            self.playhead_line.points = [x_pos, 0, x_pos, self.height]
         except Exception as e:
             debug_log(f"Playhead update error: {e}", "ERROR")
 
@@ -411,28 +540,43 @@ class PianoRollWidget(BoxLayout):
                 return
             
             all_pitches = set()
+            # Collected locally and assigned once: appending to the
+            # ListProperty would redraw the canvas for every note
+            notes = []
             
             # Extract notes from stream
             for el in music_stream.recurse().notes:
                 try:
-                    if not hasattr(el, 'offset'):
+                    # Shared by every pitch of a chord, so read once per element
+                    offset = getattr(el, 'offset', None)
+                    if offset is None:
                         continue
                     
-                    vel = getattr(el.volume, 'velocity', 100) if hasattr(el, 'volume') else 100
+                    # _volume avoids creating default Volume objects just to read 100
+                    vel = getattr(getattr(el, '_volume', None), 'velocity', 100)
+                    duration = getattr(el.duration, 'quarterLength', 1.0)
                     
                     notes_to_add = getattr(el, 'notes', [el])
                     for n in notes_to_add:
                         pitch_midi = getattr(n.pitch, 'midi', 60)
                         all_pitches.add(pitch_midi)
-                        
-                        duration = getattr(el.duration, 'quarterLength', 1.0)
-                        self.notes.append((el.offset, pitch_midi, duration, vel))
+                        notes.append((offset, pitch_midi, duration, vel))
                 except Exception as e:
                     debug_log(f"Note processing error: {e}", "ERROR")
                     continue
 
+            # Notes added with Stream.extend_notes have no Note objects
+            bulk_notes = getattr(music_stream, 'bulk_notes', None)
+            if bulk_notes is not None:
+                for pitch_midi, offset, duration, vel in bulk_notes():
+                    all_pitches.add(pitch_midi)
+                    notes.append((offset, pitch_midi, duration, vel))
+
             self.visible_pitches = sorted(list(all_pitches)) if all_pitches else list(range(60, 72))
-            self.notes.sort(key=lambda x: x[1] if len(x) > 1 else 0)
+            # Time order (then pitch): streams are mostly built in time order, so
+            # this sort and the one in _index_notes are close to linear
+            notes.sort(key=itemgetter(0, 1))
+            self.notes = notes
             self.height = max(dp(100), len(self.visible_pitches) * dp(18))
             
         except Exception as e:
@@ -440,10 +584,14 @@ class PianoRollWidget(BoxLayout):
 
 class Music21DAW(App):
     status_text = StringProperty("Ready")
+    # Shifts the playhead relative to the player position, for devices
+    # whose output latency is not reflected in getCurrentPosition()
+    midi_nudge_ms = NumericProperty(0)
 
     def build(self):
         try:
             debug_log("Building app...")
+            register_fonts()
             self.title = "SriDAW - Music21 Visual DAW"
             self.layout = MainLayout()
             
@@ -472,7 +620,13 @@ result = s
             self.current_stream = None
             self.media_player = None
             self.temp_file = None
+            self._midi_stream = None  # stream last written to temp_file
+            self._temp_midi_path = self._playback_midi_path()
+            # Single worker so playback writes and exports never overlap
+            self._midi_writer = ThreadPoolExecutor(max_workers=1)
+            self._writing_stream = None  # stream whose playback is being prepared
             self.playback_clock = None
+            self.sync_clock = None
             self.playback_start_time = 0
             self.playback_duration = 0
             self.bpm = 60
@@ -494,7 +648,7 @@ result = s
 
     def run_code(self, *args):
         try:
-            if not MUSIC21_AVAILABLE:
+            if not load_music21():
                 self.status_text = "Error: music21 not available."
                 return
                 
@@ -530,8 +684,7 @@ result = s'''
                 
                 # Get tempo
                 try:
-                    tempo_marks = self.current_stream.flat.getElementsByClass(tempo.MetronomeMark)
-                    self.bpm = tempo_marks[0].number if tempo_marks else 60
+                    self.bpm = self._stream_bpm(self.current_stream)
                     self.beat_duration = 60.0 / self.bpm
                     self.playback_duration = self.current_stream.duration.quarterLength
                 except:
@@ -545,6 +698,34 @@ result = s'''
             self.status_text = f"Execution Error: {str(e)}"
             Logger.error(f"SriDAW: Run code error: {e}")
 
+    def _playback_midi_path(self):
+        """Return the path of the temp MIDI file handed to the media player"""
+        if ANDROID:
+            try:
+                temp_dir = Context.getCacheDir().getAbsolutePath()
+            except:
+                temp_dir = "/data/data/org.example.sridaw/cache"
+                try:
+                    os.makedirs(temp_dir, exist_ok=True)
+                except:
+                    temp_dir = "/sdcard"
+        else:
+            temp_dir = tempfile.gettempdir()
+        return os.path.join(temp_dir, "playback.mid")
+
+    def _stream_bpm(self, music_stream):
+        """Return the number of the first MetronomeMark, or 60 when there is none"""
+        elements = getattr(music_stream, 'elements', None)
+        if elements is None:
+            tempo_marks = music_stream.flat.getElementsByClass(tempo.MetronomeMark)
+            return tempo_marks[0].number if tempo_marks else 60
+        # Tempo marks are normally the first element, so stop at the first hit
+        # instead of building a flat view and filtering every element
+        for el in elements:
+            if isinstance(el, tempo.MetronomeMark):
+                return el.number
+        return 60
+
     def export_midi(self, *args):
         try:
             if not self.current_stream:
@@ -566,13 +747,46 @@ result = s'''
                 export_dir = os.path.expanduser("~")
             
             midi_file = os.path.join(export_dir, f"sridaw_export_{int(time.time())}.mid")
-            self.current_stream.write('midi', fp=midi_file)
-            self.status_text = f"Exported to: {midi_file}"
+            # Copy the playback file when it was written for this stream. The
+            # copy is queued on the writer, so it runs before any later Play
+            # can overwrite that file with another stream.
+            cached_file = self.temp_file if self._midi_stream is self.current_stream else None
+            self.status_text = "Exporting..."
+            self._midi_writer.submit(self._export_midi_thread, self.current_stream, midi_file, cached_file)
             
         except Exception as e:
             self.status_text = f"Export failed: {str(e)}"
             Logger.error(f"SriDAW: Export error: {e}")
 
+    def _export_midi_thread(self, music_stream, midi_file, cached_file):
+        """Runs on the writer thread; reports back through the Clock"""
+        try:
+            if cached_file:
+                # Same .tmp + replace as Stream.write, so no partial exports
+                tmp_file = midi_file + '.tmp'
+                try:
+                    shutil.copyfile(cached_file, tmp_file)
+                    os.replace(tmp_file, midi_file)
+                except OSError:
+                    try:
+                        os.remove(tmp_file)
+                    except OSError:
+                        pass
+                    raise
+            else:
+                if music_stream.write('midi', fp=midi_file) is None:
+                    # Don't leave the placeholder in Downloads
+                    try:
+                        os.remove(midi_file)
+                    except OSError:
+                        pass
+                    raise ValueError("could not encode the stream as MIDI")
+            status = f"Exported to: {midi_file}"
+        except Exception as e:
+            status = f"Export failed: {str(e)}"
+            Logger.error(f"SriDAW: Export error: {e}")
+        Clock.schedule_once(lambda dt: setattr(self, 'status_text', status))
+
     def play_audio(self, *args):
         try:
             if not self.current_stream:
@@ -581,31 +795,57 @@ result = s'''
                 
             self.stop_audio()
             
-            # Create temp file
-            if ANDROID:
-                try:
-                    temp_dir = Context.getCacheDir().getAbsolutePath()
-                except:
-                    temp_dir = "/data/data/org.example.sridaw/cache"
-                    try:
-                        os.makedirs(temp_dir, exist_ok=True)
-                    except:
-                        temp_dir = "/sdcard"
-            else:
-                temp_dir = tempfile.gettempdir()
-                
-            self.temp_file = os.path.join(temp_dir, "playback.mid")
-            self.current_stream.write('midi', fp=self.temp_file)
+            # Replaying the same stream reuses the file written last time
+            if self._midi_stream is self.current_stream:
+                self._start_playback()
+                return
 
-            if ANDROID: 
-                self._play_android()
-            else: 
-                self.status_text = "Playback not supported on this platform"
+            # Otherwise serialize on the writer thread and start from there
+            self.status_text = "Preparing..."
+            self._midi_stream = None
+            self._writing_stream = self.current_stream
+            self._midi_writer.submit(self._write_playback_midi, self.current_stream)
                 
         except Exception as e:
             self.status_text = f"Playback Error: {str(e)}"
             Logger.error(f"SriDAW: Play error: {e}")
 
+    def _write_playback_midi(self, music_stream):
+        """Runs on the writer thread; hands the result back to the UI thread"""
+        error = None
+        try:
+            # write() returns None when it fell back to the placeholder file
+            if music_stream.write('midi', fp=self._temp_midi_path) is None:
+                error = "could not encode the stream as MIDI"
+        except Exception as e:
+            error = e
+        Clock.schedule_once(lambda dt: self._on_playback_midi_written(music_stream, error))
+
+    def _on_playback_midi_written(self, music_stream, error):
+        # Stop, Run or another Play since the write started cancels this one
+        current = music_stream is self._writing_stream and music_stream is self.current_stream
+
+        if error is not None:
+            Logger.error(f"SriDAW: Play error: {error}")
+            if current:
+                self._writing_stream = None
+                self.status_text = f"Playback Error: {str(error)}"
+            return
+
+        if music_stream is self.current_stream:
+            self.temp_file = self._temp_midi_path
+            self._midi_stream = music_stream
+
+        if current:
+            self._writing_stream = None
+            self._start_playback()
+
+    def _start_playback(self):
+        if ANDROID: 
+            self._play_android()
+        else: 
+            self.status_text = "Playback not supported on this platform"
+
     def _play_android(self):
         try:
             MediaPlayer = autoclass('android.media.MediaPlayer')
@@ -642,12 +882,28 @@ result = s'''
     def _start_playhead_animation(self):
         try:
             self.playback_clock = Clock.schedule_interval(self._update_playback_progress, 1/30.)
+            self._sync_deadline = time.time() + 0.5
+            self.sync_clock = Clock.schedule_interval(self._sync_playhead_to_player, 1/30.)
         except Exception as e:
             Logger.error(f"SriDAW: Playhead animation error: {e}")
 
+    def _sync_playhead_to_player(self, dt):
+        """Re-anchor the playhead once the player reports that audio is flowing"""
+        try:
+            if self.media_player:
+                position_ms = self.media_player.getCurrentPosition()
+                if position_ms > 0:
+                    self.playback_start_time = time.time() - position_ms / 1000.0
+                    return False
+            if time.time() > self._sync_deadline:
+                return False
+        except Exception as e:
+            Logger.error(f"SriDAW: Playhead sync error: {e}")
+            return False
+
     def _update_playback_progress(self, dt):
         try:
-            elapsed = time.time() - self.playback_start_time
+            elapsed = time.time() - self.playback_start_time + self.midi_nudge_ms / 1000.0
             current_beat = elapsed / self.beat_duration
             if current_beat > self.playback_duration:
                 self.stop_audio()
@@ -658,9 +914,15 @@ result = s'''
 
     def stop_audio(self, *args):
         try:
+            self._writing_stream = None
+
             if self.playback_clock:
                 self.playback_clock.cancel()
                 self.playback_clock = None
+
+            if self.sync_clock:
+                self.sync_clock.cancel()
+                self.sync_clock = None
             
             if self.media_player:
                 try:
@@ -671,14 +933,6 @@ result = s'''
                     pass
                 finally:
                     self.media_player = None
-            
-            # Clean up temp file
-            if self.temp_file and os.path.exists(self.temp_file):
-                try:
-                    os.remove(self.temp_file)
-                except:
-                    pass
-                self.temp_file = None
                     
             try:
                 self.layout.ids.piano_roll.is_playing = False
@@ -686,7 +940,7 @@ result = s'''
             except:
                 pass
                 
-            if "Playing" in self.status_text:
+            if "Playing" in self.status_text or "Preparing" in self.status_text:
                 self.status_text = "Playback stopped"
                 
         except Exception as e:
@@ -695,11 +949,12 @@ result = s'''
     def on_stop(self):
         try:
             self.stop_audio()
-            if self.temp_file and os.path.exists(self.temp_file):
-                try: 
-                    os.remove(self.temp_file)
-                except: 
-                    pass
+            # Let queued writes finish first so none can recreate the file
+            self._midi_writer.shutdown(wait=True)
+            try:
+                os.remove(self._temp_midi_path)
+            except OSError:
+                pass
         except Exception as e:
             Logger.error(f"SriDAW: Stop cleanup error: {e}")
 
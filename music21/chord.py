@@ -7,6 +7,8 @@ from .duration import Duration
 from .dynamics import Volume
 
 class Chord:
+    _is_note_like = True
+    
     def __init__(self, pitches=None, quarterLength=1.0, volume=None):
         if pitches is None:
             pitches = ["C4", "E4", "G4"]
@@ -17,9 +19,21 @@ class Chord:
             self.notes.append(note)
         
         self.duration = Duration(quarterLength)
-        self.volume = volume or Volume()
+        self._volume = volume  # Default Volume is only created when first read
         self.offset = 0.0
     
+    @property
+    def volume(self):
+        """Volume of the chord, created on first access if none was given"""
+        volume = self._volume
+        if volume is None:
+            volume = self._volume = Volume()
+        return volume
+    
+    @volume.setter
+    def volume(self, value):
+        self._volume = value
+    
     def __repr__(self):
         note_names = [note.pitch.name for note in self.notes]
         return f"Chord({note_names})"
\ No newline at end of file
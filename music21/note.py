@@ -5,7 +5,28 @@ Minimal note implementation
 from .duration import Duration
 from .dynamics import Volume
 
+NOTE_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+STEP_SEMITONES = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+
+def _build_name_table():
+    """Map every plain, sharp and flat spelling (with and without octave) to MIDI"""
+    table = {}
+    for step, semitone in STEP_SEMITONES.items():
+        for accidental, shift in (('', 0), ('#', 1), ('b', -1)):
+            table[step + accidental] = 60 + semitone + shift  # default octave 4
+            for octave in range(-1, 10):
+                table[f"{step}{accidental}{octave}"] = (octave + 1) * 12 + semitone + shift
+    return table
+
+# Lookup tables so constructing a Pitch is a dict/tuple access; other
+# spellings fall back to parsing the name
+_NAME_TO_MIDI = _build_name_table()
+_MIDI_TO_NAME = tuple(f"{NOTE_NAMES[m % 12]}{m // 12 - 1}" for m in range(128))
+
 class Pitch:
+    # __dict__ keeps ad-hoc attributes (octave, accidental, ...) working
+    __slots__ = ('midi', 'name', '__dict__')
+
     def __init__(self, name_or_midi):
         if isinstance(name_or_midi, str):
             self.midi = self._name_to_midi(name_or_midi)
@@ -16,6 +37,13 @@ class Pitch:
     
     def _name_to_midi(self, name):
         """Convert note name to MIDI number"""
+        midi = _NAME_TO_MIDI.get(name)
+        if midi is not None:
+            return midi
+        return self._parse_name(name)
+
+    def _parse_name(self, name):
+        """Parse a note name not found in the lookup table"""
         note_map = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
         
         # Parse note name (e.g., "C4", "F#3", "Bb5")
@@ -47,15 +75,20 @@ class Pitch:
     
     def _midi_to_name(self, midi_num):
         """Convert MIDI number to note name"""
-        note_names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+        if 0 <= midi_num < 128:
+            return _MIDI_TO_NAME[midi_num]
         octave = (midi_num // 12) - 1
         note_index = midi_num % 12
-        return f"{note_names[note_index]}{octave}"
+        return f"{NOTE_NAMES[note_index]}{octave}"
     
     def __repr__(self):
         return f"Pitch({self.name})"
 
 class Note:
+    # __dict__ keeps ad-hoc attributes (articulations, lyric, ...) working
+    __slots__ = ('pitch', 'duration', '_volume', 'offset', '__dict__')
+    _is_note_like = True
+
     def __init__(self, pitch=None, quarterLength=1.0, volume=None):
         if pitch is None:
             pitch = "C4"
@@ -66,9 +99,21 @@ class Note:
             self.pitch = pitch
             
         self.duration = Duration(quarterLength)
-        self.volume = volume or Volume()
+        self._volume = volume  # Default Volume is only created when first read
         self.offset = 0.0
     
+    @property
+    def volume(self):
+        """Volume of the note, created on first access if none was given"""
+        volume = self._volume
+        if volume is None:
+            volume = self._volume = Volume()
+        return volume
+    
+    @volume.setter
+    def volume(self, value):
+        self._volume = value
+    
     @property
     def notes(self):
         """For compatibility with chord interface"""
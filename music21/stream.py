@@ -3,22 +3,77 @@ Minimal stream implementation with better error handling
 """
 
 from .duration import Duration
-import io
+import os
+import struct
+from operator import itemgetter
+
+# Header chunk: length 6, format 0, one track, 96 ticks per quarter note
+_MIDI_HEADER = b'MThd\x00\x00\x00\x06\x00\x00\x00\x01\x00\x60'
+
+# Fallback file written when a stream can't be encoded: a single C4 quarter note
+_MINIMAL_MIDI_BYTES = _MIDI_HEADER + b'MTrk\x00\x00\x00\x0c' + bytes((
+    0x00, 0x90, 60, 100,    # Note on C4
+    0x60, 0x80, 60, 0,      # Note off after 96 ticks
+    0x00, 0xFF, 0x2F, 0x00, # End of track
+))
+
+# Sort key for (tick, order, pitch, velocity) MIDI events
+_EVENT_ORDER = itemgetter(0, 1)
+
+def _write_file(filepath, data):
+    """Write data via a temporary sibling file so readers never see a partial MIDI"""
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, filepath)
+
+def _vlq(value):
+    """Convert a tick count to MIDI variable length quantity bytes"""
+    # Most deltas fit in one byte; wider ones are unrolled up to the
+    # four bytes MIDI allows
+    if value < 0x80:
+        return (value if value > 0 else 0,)
+    if value < 0x4000:
+        return ((value >> 7) | 0x80, value & 0x7F)
+    if value < 0x200000:
+        return ((value >> 14) | 0x80, ((value >> 7) & 0x7F) | 0x80, value & 0x7F)
+    if value < 0x10000000:
+        return ((value >> 21) | 0x80, ((value >> 14) & 0x7F) | 0x80,
+                ((value >> 7) & 0x7F) | 0x80, value & 0x7F)
+    result = [value & 0x7F]
+    value >>= 7
+    while value > 0:
+        result.append((value & 0x7F) | 0x80)
+        value >>= 7
+    result.reverse()
+    return result
 
 class Stream:
     def __init__(self):
         self.elements = []
+        self._notes = []  # Note-like elements, in insertion order
         self._duration = None
+        self._max_end = 0.0  # Where append places the next element
+        # Notes added in bulk by extend_notes, kept as parallel columns
+        self._midi = []
+        self._off = []
+        self._dur = []
+        self._vel = []
+    
+    def _extend_end(self, element):
+        """Fold a newly added element into the running stream end"""
+        end = element.offset + getattr(getattr(element, 'duration', None), 'quarterLength', 0.0)
+        if end > self._max_end:
+            self._max_end = end
     
     def append(self, element):
         """Add element to the end of the stream"""
         try:
-            if hasattr(element, 'offset'):
-                element.offset = self.duration.quarterLength if self._duration else 0.0
-            else:
-                element.offset = self.duration.quarterLength if self._duration else 0.0
+            element.offset = self._max_end
             self.elements.append(element)
-            self._duration = None  # Reset cached duration
+            if getattr(element, '_is_note_like', False):
+                self._notes.append(element)
+            self._extend_end(element)
         except Exception as e:
             print(f"Stream append error: {e}")
     
@@ -27,29 +82,67 @@ class Stream:
         try:
             element.offset = float(offset)
             self.elements.append(element)
-            self._duration = None  # Reset cached duration
+            if getattr(element, '_is_note_like', False):
+                self._notes.append(element)
+            self._extend_end(element)
         except Exception as e:
             print(f"Stream insert error: {e}")
     
+    def extend_notes(self, pitches, offsets, durations, velocities=None):
+        """Add many notes at once from parallel sequences, without Note objects
+        
+        Raises ValueError for sequences of different lengths or pitches outside
+        0..127. Bulk notes are not returned by recurse().notes; read them back
+        with bulk_notes().
+        """
+        pitches = [int(p) for p in pitches]
+        offsets = [float(o) for o in offsets]
+        durations = [float(d) for d in durations]
+        if velocities is None:
+            velocities = [100] * len(pitches)
+        else:
+            # Clamped here so the MIDI writer can use them as-is
+            velocities = [127 if v > 127 else v if v > 0 else 1 for v in map(int, velocities)]
+        if not len(pitches) == len(offsets) == len(durations) == len(velocities):
+            raise ValueError("pitches, offsets, durations and velocities differ in length")
+        if not all(0 <= p <= 127 for p in pitches):
+            raise ValueError("pitches must be MIDI note numbers in 0..127")
+        if not pitches:
+            return
+        self._midi.extend(pitches)
+        self._off.extend(offsets)
+        self._dur.extend(durations)
+        self._vel.extend(velocities)
+        end = max(map(float.__add__, offsets, durations))
+        if end > self._max_end:
+            self._max_end = end
+    
+    def bulk_notes(self):
+        """Iterate (midi, offset, quarterLength, velocity) for notes added by extend_notes"""
+        return zip(self._midi, self._off, self._dur, self._vel)
+    
     @property
     def duration(self):
-        """Calculate total duration of the stream"""
-        try:
-            if self._duration is None:
-                max_end = 0.0
-                for element in self.elements:
-                    try:
-                        if hasattr(element, 'duration') and hasattr(element, 'offset'):
-                            end_time = element.offset + element.duration.quarterLength
-                            max_end = max(max_end, end_time)
-                        elif hasattr(element, 'offset'):
-                            max_end = max(max_end, element.offset)
-                    except:
-                        continue
-                self._duration = Duration(max_end)
-            return self._duration
-        except:
-            return Duration(10.0)  # Fallback duration
+        """Total duration of the stream"""
+        # Rescanned on every read, since scripts can change an element's offset
+        # or duration after adding it; append then continues from the result
+        max_end = 0.0
+        for element in self.elements:
+            try:
+                end = element.offset + getattr(getattr(element, 'duration', None), 'quarterLength', 0.0)
+            except Exception:
+                continue
+            if end > max_end:
+                max_end = end
+        if self._midi:
+            max_end = max(max_end, max(map(float.__add__, self._off, self._dur)))
+        self._max_end = max_end
+        
+        # The cached Duration is reused while it still matches the stream end
+        duration = self._duration
+        if duration is None or duration.quarterLength != max_end:
+            self._duration = duration = Duration(max_end)
+        return duration
     
     def recurse(self):
         """Return a RecursiveIterator for compatibility"""
@@ -68,137 +161,119 @@ class Stream:
             return []
     
     def write(self, format_type, fp=None):
-        """Write stream to file (minimal MIDI implementation)"""
+        """Write stream to file (minimal MIDI implementation)
+        
+        Returns fp, or None when the stream couldn't be encoded and the
+        minimal fallback file was written instead.
+        """
         try:
             if format_type == 'midi':
-                self._write_midi(fp)
+                if self._write_midi(fp):
+                    return fp
             else:
                 raise ValueError(f"Unsupported format: {format_type}")
         except Exception as e:
             print(f"Write error: {e}")
             # Create minimal valid MIDI file
             self._write_minimal_midi(fp)
+        return None
     
     def _write_minimal_midi(self, filepath):
         """Create a minimal valid MIDI file"""
         try:
-            # Very basic MIDI file
-            midi_data = bytearray()
-            
-            # Header chunk
-            midi_data.extend(b'MThd')
-            midi_data.extend((0, 0, 0, 6).to_bytes(4, 'big'))
-            midi_data.extend((0, 0).to_bytes(2, 'big'))  # Format 0
-            midi_data.extend((0, 1).to_bytes(2, 'big'))  # 1 track
-            midi_data.extend((0, 96).to_bytes(2, 'big')) # 96 ticks per quarter
-            
-            # Track chunk with single note
-            track_data = bytearray()
-            track_data.extend([0x00, 0x90, 60, 100])  # Note on C4
-            track_data.extend([0x60, 0x80, 60, 0])    # Note off after 96 ticks
-            track_data.extend([0x00, 0xFF, 0x2F, 0x00]) # End of track
-            
-            midi_data.extend(b'MTrk')
-            midi_data.extend(len(track_data).to_bytes(4, 'big'))
-            midi_data.extend(track_data)
-            
-            with open(filepath, 'wb') as f:
-                f.write(midi_data)
+            _write_file(filepath, _MINIMAL_MIDI_BYTES)
         except Exception as e:
             print(f"Minimal MIDI write error: {e}")
     
     def _write_midi(self, filepath):
-        """Create a MIDI file from stream elements"""
+        """Create a MIDI file from stream elements; False if the fallback was written"""
         try:
-            midi_data = bytearray()
-            
-            # Header chunk
-            midi_data.extend(b'MThd')
-            midi_data.extend((0, 0, 0, 6).to_bytes(4, 'big'))
-            midi_data.extend((0, 0).to_bytes(2, 'big'))  # Format type 0
-            midi_data.extend((0, 1).to_bytes(2, 'big'))  # Number of tracks
-            midi_data.extend((0, 96).to_bytes(2, 'big')) # Ticks per quarter note
-            
-            # Track chunk
-            track_data = bytearray()
-            
-            # Sort elements by offset
-            sorted_elements = sorted(self.elements, key=lambda x: getattr(x, 'offset', 0))
-            
-            last_time = 0
-            for element in sorted_elements:
+            # Collect note on/off events; note-offs sort ahead of note-ons on
+            # the same tick so back-to-back notes on one pitch don't cut each
+            # other off. Zero-length notes keep their off after their on.
+            events = []
+            for element in self._notes:
+                # Coerce once per element; a bad element is skipped rather than
+                # losing the whole piece to the fallback file
                 try:
                     if hasattr(element, 'pitch'):  # Single note
-                        offset_ticks = int(getattr(element, 'offset', 0) * 96)
-                        duration_ticks = int(getattr(element.duration, 'quarterLength', 1.0) * 96)
-                        velocity = getattr(getattr(element, 'volume', None), 'velocity', 100)
-                        
-                        # Delta time for note on
-                        delta = offset_ticks - last_time
-                        track_data.extend(self._variable_length(delta))
-                        track_data.extend([0x90, element.pitch.midi, min(127, max(1, velocity))])
-                        
-                        # Delta time for note off
-                        track_data.extend(self._variable_length(duration_ticks))
-                        track_data.extend([0x80, element.pitch.midi, 0])
-                        
-                        last_time = offset_ticks + duration_ticks
-                        
+                        pitches = (int(element.pitch.midi),)
                     elif hasattr(element, 'notes'):  # Chord
-                        offset_ticks = int(getattr(element, 'offset', 0) * 96)
-                        duration_ticks = int(getattr(element.duration, 'quarterLength', 1.0) * 96)
-                        velocity = getattr(getattr(element, 'volume', None), 'velocity', 100)
-                        
-                        # Note on events for all notes in chord
-                        for i, note in enumerate(element.notes):
-                            delta = (offset_ticks - last_time) if i == 0 else 0
-                            track_data.extend(self._variable_length(delta))
-                            track_data.extend([0x90, note.pitch.midi, min(127, max(1, velocity))])
-                            if i == 0:
-                                last_time = offset_ticks
-                        
-                        # Note off events
-                        for i, note in enumerate(element.notes):
-                            delta = duration_ticks if i == 0 else 0
-                            track_data.extend(self._variable_length(delta))
-                            track_data.extend([0x80, note.pitch.midi, 0])
-                            if i == 0:
-                                last_time += duration_ticks
-                except Exception as e:
-                    print(f"Element processing error: {e}")
+                        pitches = [int(note.pitch.midi) for note in element.notes]
+                    else:
+                        continue
+                    offset_ticks = int(element.offset * 96)
+                    duration_ticks = int(getattr(element.duration, 'quarterLength', 1.0) * 96)
+                    # Read _volume so notes without one don't get a Volume created;
+                    # a missing velocity (None) means the default
+                    velocity = getattr(element._volume, 'velocity', None)
+                    velocity = 100 if velocity is None else int(velocity)
+                except (AttributeError, TypeError, ValueError) as e:
+                    print(f"Skipping element {element!r}: {e}")
                     continue
+                velocity = 127 if velocity > 127 else velocity if velocity > 0 else 1
+                off_order = 0 if duration_ticks > 0 else 2
+                
+                for pitch in pitches:
+                    if not 0 <= pitch <= 127:
+                        print(f"Skipping note with out-of-range pitch: {pitch}")
+                        continue
+                    events.append((offset_ticks, 1, pitch, velocity))
+                    events.append((offset_ticks + duration_ticks, off_order, pitch, 0))
+            
+            for pitch, offset, duration, velocity in zip(self._midi, self._off, self._dur, self._vel):
+                offset_ticks = int(offset * 96)
+                duration_ticks = int(duration * 96)
+                events.append((offset_ticks, 1, pitch, velocity))
+                events.append((offset_ticks + duration_ticks, 0 if duration_ticks > 0 else 2, pitch, 0))
+            
+            # Stable sort keeps insertion order among simultaneous events
+            events.sort(key=_EVENT_ORDER)
+            
+            # Each event is at most a 4-byte delta plus 3 data bytes, so the
+            # track can be written into one buffer allocated up front.
+            # Note-offs are sent as zero-velocity note-ons, so every event is a
+            # note-on and only the first needs a status byte (running status).
+            track_data = bytearray(7 * len(events) + 4)
+            pos = 0
+            last_time = 0
+            status_pending = True
+            for tick, _, pitch, velocity in events:
+                delta = tick - last_time
+                if 0 <= delta < 0x80:
+                    track_data[pos] = delta
+                    pos += 1
+                else:
+                    chunk = bytes(_vlq(delta))
+                    end = pos + len(chunk)
+                    if end + 3 > len(track_data):  # Delta wider than MIDI allows
+                        track_data.extend(bytes(end + 3 - len(track_data)))
+                    track_data[pos:end] = chunk
+                    pos = end
+                if status_pending:
+                    track_data[pos] = 0x90
+                    pos += 1
+                    status_pending = False
+                track_data[pos] = pitch
+                track_data[pos + 1] = velocity
+                pos += 2
+                last_time = tick
             
             # End of track
-            track_data.extend([0x00, 0xFF, 0x2F, 0x00])
+            track_data[pos:pos + 4] = b'\x00\xff\x2f\x00'
+            pos += 4
             
-            # Track header
-            midi_data.extend(b'MTrk')
-            midi_data.extend(len(track_data).to_bytes(4, 'big'))
-            midi_data.extend(track_data)
+            midi_data = b''.join((_MIDI_HEADER, b'MTrk', struct.pack('>I', pos),
+                                  memoryview(track_data)[:pos]))
             
             # Write to file
-            with open(filepath, 'wb') as f:
-                f.write(midi_data)
+            _write_file(filepath, midi_data)
+            return True
                 
         except Exception as e:
             print(f"MIDI write error: {e}")
             self._write_minimal_midi(filepath)
-    
-    def _variable_length(self, value):
-        """Convert integer to MIDI variable length quantity"""
-        try:
-            value = int(value)
-            if value < 0:
-                value = 0
-            result = []
-            result.append(value & 0x7F)
-            value >>= 7
-            while value > 0:
-                result.append((value & 0x7F) | 0x80)
-                value >>= 7
-            return list(reversed(result))
-        except:
-            return [0]
+            return False
 
 class RecursiveIterator:
     def __init__(self, stream):
@@ -207,14 +282,7 @@ class RecursiveIterator:
     @property
     def notes(self):
         """Get all note-like elements"""
-        try:
-            notes = []
-            for element in self.stream.elements:
-                if hasattr(element, 'pitch') or hasattr(element, 'notes'):
-                    notes.append(element)
-            return notes
-        except:
-            return []
+        return list(self.stream._notes)
 
 class FlatStream:
     def __init__(self, stream):
@@ -3,6 +3,9 @@ Minimal tempo implementation
 """
 
 class MetronomeMark:
+    # __dict__ keeps ad-hoc attributes (text, ...) working
+    __slots__ = ('number', 'offset', '__dict__')
+
     def __init__(self, number=120):
         self.number = number
         self.offset = 0.0